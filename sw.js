@@ -1,23 +1,257 @@
 console.log('Service Worker: Loading');
 
+// Keep in sync with the loadPyodide import in index.html
+const PYODIDE_VERSION = '0.27.0';
+const PYODIDE_BASE_URL = `https://cdn.jsdelivr.net/pyodide/v${PYODIDE_VERSION}/full/`;
+const PYODIDE_LOCK_URL = PYODIDE_BASE_URL + 'pyodide-lock.json';
+const RUNTIME_CACHE_PREFIX = 'pyodide-runtime-';
+
+// Small cache holding the runtime cache names chosen at install and activate time,
+// so fetch handling never has to touch the network to find the current cache
+const METADATA_CACHE = 'runtime-cache-metadata';
+const INSTALLED_CACHE_KEY = './runtime-cache/installed';
+const ACTIVE_CACHE_KEY = './runtime-cache/active';
+
+// Decoded body size recorded when a response is stored, counted as bytes saved on a hit
+const BODY_SIZE_HEADER = 'X-Runtime-Cache-Body-Size';
+
+// Core runtime files fetched by loadPyodide() on every start
+const PRECACHE_FILES = [
+    'pyodide.mjs',
+    'pyodide.asm.js',
+    'pyodide.asm.wasm',
+    'python_stdlib.zip',
+];
+// Packages passed to pyodide.loadPackage() in index.html, resolved to wheels via pyodide-lock.json
+const PRECACHE_PACKAGES = ['micropip', 'ssl'];
+
+// Cache hit statistics for each page load, keyed by client id
+const runtimeCacheStats = new Map();
+
+let activeCacheNamePromise = null;
+
+async function readMetadata(key) {
+    const response = await caches.match(key, { cacheName: METADATA_CACHE });
+    return response ? response.text() : null;
+}
+
+async function writeMetadata(key, value) {
+    const cache = await caches.open(METADATA_CACHE);
+    await cache.put(key, new Response(value));
+}
+
+function getActiveCacheName() {
+    if (!activeCacheNamePromise) {
+        activeCacheNamePromise = readMetadata(ACTIVE_CACHE_KEY);
+    }
+    return activeCacheNamePromise;
+}
+
+const PYODIDE_REQUIREMENTS_URL = './pyodide-requirements.txt';
+
+// The cache name includes the Pyodide version and a hash of pyodide-requirements.txt,
+// so changing either one starts a fresh cache and evicts the old ones
+async function runtimeCacheName(requirements) {
+    const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(requirements));
+    const requirementsHash = Array.from(new Uint8Array(digest).slice(0, 8))
+        .map(byte => byte.toString(16).padStart(2, '0'))
+        .join('');
+    return `${RUNTIME_CACHE_PREFIX}v${PYODIDE_VERSION}-${requirementsHash}`;
+}
+
+async function versionRuntimeCache() {
+    const response = await fetch(PYODIDE_REQUIREMENTS_URL, { cache: 'no-cache' });
+    if (!response.ok) {
+        throw new Error(`pyodide-requirements.txt returned ${response.status}`);
+    }
+    return runtimeCacheName(await response.text());
+}
+
+// Store a response together with its decoded body size, so hits never read the body
+async function storeRuntimeResponse(cacheName, request, response) {
+    // Don't recreate a cache that was evicted while the response was in flight
+    if (!(await caches.has(cacheName))) return;
+    const body = await response.blob();
+    const headers = new Headers(response.headers);
+    headers.set(BODY_SIZE_HEADER, String(body.size));
+    const cache = await caches.open(cacheName);
+    await cache.put(request, new Response(body, {
+        status: response.status,
+        statusText: response.statusText,
+        headers: headers,
+    }));
+}
+
+async function fetchRuntimeFile(url) {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error(`${url} returned ${response.status}`);
+    }
+    return response;
+}
+
+async function precacheRuntime(cacheName) {
+    // Resolve the preloaded packages and their dependencies to wheel files
+    const lockResponse = await fetchRuntimeFile(PYODIDE_LOCK_URL);
+    const lock = await lockResponse.clone().json();
+    await storeRuntimeResponse(cacheName, PYODIDE_LOCK_URL, lockResponse);
+
+    const wheels = new Set();
+    const pending = [...PRECACHE_PACKAGES];
+    while (pending.length > 0) {
+        const info = lock.packages[pending.pop()];
+        if (!info || wheels.has(info.file_name)) continue;
+        wheels.add(info.file_name);
+        pending.push(...info.depends);
+    }
+
+    const urls = [...PRECACHE_FILES, ...wheels].map(file => PYODIDE_BASE_URL + file);
+    await Promise.all(urls.map(async (url) => {
+        await storeRuntimeResponse(cacheName, url, await fetchRuntimeFile(url));
+    }));
+    console.log(`Service Worker: Precached ${urls.length + 1} runtime files`);
+}
+
+// Fill the new versioned cache; the active cache is only switched over in activate
+async function installRuntimeCache() {
+    const cacheName = await versionRuntimeCache();
+    await caches.open(cacheName);
+    await writeMetadata(INSTALLED_CACHE_KEY, cacheName);
+    try {
+        await precacheRuntime(cacheName);
+    } catch (error) {
+        // The runtime cache still fills up on first use
+        console.error('Service Worker: Precache failed:', error);
+    }
+}
+
+// Make cacheName the cache served by fetch handling and evict all other runtime caches
+async function switchRuntimeCache(cacheName) {
+    await caches.open(cacheName);
+    await writeMetadata(ACTIVE_CACHE_KEY, cacheName);
+    activeCacheNamePromise = Promise.resolve(cacheName);
+
+    // Evict caches left behind by previous Pyodide versions or requirements
+    const cacheNames = await caches.keys();
+    await Promise.all(cacheNames
+        .filter(name => name.startsWith(RUNTIME_CACHE_PREFIX) && name !== cacheName)
+        .map(name => {
+            console.log('Service Worker: Evicting stale runtime cache', name);
+            return caches.delete(name);
+        }));
+}
+
+async function activateRuntimeCache() {
+    const cacheName = await readMetadata(INSTALLED_CACHE_KEY);
+    // Versioning failed during install, keep serving from the current cache
+    if (cacheName === null) return;
+    await switchRuntimeCache(cacheName);
+}
+
+// Editing pyodide-requirements.txt does not reinstall the service worker, so every
+// page load reports the requirements it is about to install
+async function syncRuntimeCacheVersion(requirements) {
+    const cacheName = await runtimeCacheName(requirements);
+    if (cacheName !== await getActiveCacheName()) {
+        await switchRuntimeCache(cacheName);
+    }
+}
+
+// Drop statistics for pages that were closed without asking for them
+async function pruneRuntimeCacheStats() {
+    for (const clientId of runtimeCacheStats.keys()) {
+        if (!(await self.clients.get(clientId))) {
+            runtimeCacheStats.delete(clientId);
+        }
+    }
+}
+
+async function recordRuntimeRequest(clientId, cached) {
+    const stats = runtimeCacheStats.get(clientId) || { hits: 0, misses: 0, bytesSaved: 0 };
+    runtimeCacheStats.set(clientId, stats);
+    if (cached) {
+        stats.hits += 1;
+        stats.bytesSaved += Number(cached.headers.get(BODY_SIZE_HEADER)) || 0;
+    } else {
+        stats.misses += 1;
+    }
+    await pruneRuntimeCacheStats();
+}
+
+function isRuntimeArtifact(url) {
+    return url.href.startsWith(PYODIDE_BASE_URL) || url.pathname.endsWith('.whl');
+}
+
+// Serve Pyodide runtime files and wheels cache-first, filling the cache on a miss
+async function handleRuntimeRequest(event) {
+    const request = event.request;
+    const cacheName = await getActiveCacheName();
+    if (cacheName === null) {
+        return fetch(request);
+    }
+
+    const cached = await caches.match(request, { cacheName: cacheName });
+    if (cached) {
+        event.waitUntil(recordRuntimeRequest(event.clientId, cached));
+        return cached;
+    }
+
+    event.waitUntil(recordRuntimeRequest(event.clientId, null));
+    const response = await fetch(request);
+    if (response.ok) {
+        event.waitUntil(storeRuntimeResponse(cacheName, request, response.clone()));
+    }
+    return response;
+}
+
 self.addEventListener('install', (event) => {
     console.log('Service Worker: Installing...');
     // Force the waiting service worker to become the active service worker.
-    event.waitUntil(self.skipWaiting());
+    // A failed precache should not block installation.
+    event.waitUntil(Promise.all([
+        self.skipWaiting(),
+        installRuntimeCache().catch(error => console.error('Service Worker: Runtime cache versioning failed:', error)),
+    ]));
 });
 
 self.addEventListener('activate', (event) => {
     console.log('Service Worker: Activating...');
     // Become available to all pages
-    event.waitUntil(self.clients.claim());
+    event.waitUntil(Promise.all([
+        self.clients.claim(),
+        activateRuntimeCache().catch(error => console.error('Service Worker: Runtime cache activation failed:', error)),
+    ]));
+});
+
+self.addEventListener('message', (event) => {
+    // Switch to the runtime cache matching the requirements of the loading page
+    if (event.data && event.data.type === 'RUNTIME_CACHE_VERSION') {
+        event.waitUntil(syncRuntimeCacheVersion(event.data.requirements)
+            .catch(error => console.error('Service Worker: Runtime cache versioning failed:', error))
+            .then(() => event.ports[0].postMessage({})));
+    }
+
+    // Report the runtime cache statistics for the page load that asks for them
+    if (event.data && event.data.type === 'RUNTIME_CACHE_STATS') {
+        const clientId = event.source.id;
+        const stats = runtimeCacheStats.get(clientId) || { hits: 0, misses: 0, bytesSaved: 0 };
+        runtimeCacheStats.delete(clientId);
+        event.ports[0].postMessage(stats);
+    }
 });
 
 // Service Worker to intercept Flask routes and handle them with Pyodide
 self.addEventListener('fetch', (event) => {
     const url = new URL(event.request.url);
     
-    // Skip cross-origin requests so external resources (e.g. PyPI wheels)
-    // are fetched normally without being intercepted by this service worker.
+    // Pyodide runtime files and wheels (e.g. from PyPI) are served from the runtime cache
+    if (event.request.method === 'GET' && isRuntimeArtifact(url)) {
+        event.respondWith(handleRuntimeRequest(event));
+        return;
+    }
+
+    // Skip other cross-origin requests so external resources are fetched
+    // normally without being intercepted by this service worker.
     if (url.origin !== self.location.origin) {
         // Let the browser handle the request as usual.
         return;
@@ -6,6 +6,8 @@ This test suite verifies that all components are properly configured and working
 
 import os
 import json
+import re
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -224,7 +226,17 @@ class TestHTMLStructure:
         
         # Check for main.py fetch
         assert "main.py" in content, "Should fetch main.py file"
-    
+
+    def test_hot_reload_reuses_interpreter(self):
+        """Test that hot reload re-runs main.py without reloading Pyodide."""
+        with open("index.html", "r") as f:
+            content = f.read()
+
+        assert "hot-reload" in content, "Should support a hot-reload mode"
+        assert "watchMainModule" in content, "Should watch main.py for changes"
+        assert content.count("loadPyodide()") == 1, "Pyodide should only be initialized once"
+        assert "pyodide.globals.set('app'" in content, "Should swap in the reloaded Flask app"
+
     def test_tailwind_classes_used(self):
         """Test that HTML uses Tailwind CSS classes."""
         with open("index.html", "r") as f:
@@ -472,6 +484,118 @@ class TestPyCardanoIntegration:
         # Should have fallback mechanism
         assert "fall back" in content.lower() or "fallback" in content.lower(), "Should have fallback handling"
 
+    def test_service_worker_precaches_pyodide_runtime(self):
+        """Test that the service worker precaches the Pyodide version loaded by index.html."""
+        sw_content = Path("sw.js").read_text()
+        html_content = Path("index.html").read_text()
+
+        match = re.search(r"const PYODIDE_VERSION = '([^']+)';", sw_content)
+        assert match is not None, "Service worker should define PYODIDE_VERSION"
+        assert f"/pyodide/v{match.group(1)}/full/pyodide.mjs" in html_content, \
+            "Service worker and index.html should use the same Pyodide version"
+
+        # Should use a versioned cache and evict stale ones
+        assert "caches.open" in sw_content, "Should use the Cache API"
+        assert "pyodide-requirements.txt" in sw_content, "Cache version should depend on pyodide-requirements.txt"
+        assert "caches.delete" in sw_content, "Should evict stale runtime caches"
+
+    def test_pyodide_requirements_installed_by_page(self):
+        """Test that index.html installs the packages listed in pyodide-requirements.txt."""
+        content = Path("index.html").read_text()
+        requirements = Path("pyodide-requirements.txt").read_text()
+
+        assert "pycardano==" in requirements, "PyCardano should be installed in the browser"
+        assert "fetch('./pyodide-requirements.txt')" in content, "Should fetch pyodide-requirements.txt"
+        assert "micropip.install(packages)" in content, "Should install the fetched requirements"
+        assert "RUNTIME_CACHE_VERSION" in content, "Should report the requirements to the service worker"
+
+    def test_service_worker_evicts_cache_on_requirements_change(self):
+        """Test that changed requirements switch the runtime cache without reinstalling sw.js."""
+        if shutil.which("node") is None:
+            pytest.skip("Node.js is required to run the service worker")
+
+        result = subprocess.run(
+            ["node", "-e", SERVICE_WORKER_HARNESS, str(Path("sw.js").resolve())],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        assert result.returncode == 0, f"Service worker harness failed: {result.stderr}"
+
+        state = json.loads(result.stdout)
+        installed, switched = state["installed"], state["switched"]
+        assert installed["active"].startswith("pyodide-runtime-"), "Install should activate a runtime cache"
+        assert installed["active"] in installed["caches"], "Active runtime cache should exist"
+        assert switched["active"] != installed["active"], "Changed requirements should select a new cache"
+        assert switched["active"] in switched["caches"], "New runtime cache should exist"
+        assert installed["active"] not in switched["caches"], "Stale runtime cache should be evicted"
+
+
+# Runs sw.js in Node with in-memory Cache API and fetch stand-ins, installs and
+# activates it, then reports changed requirements the way index.html does
+SERVICE_WORKER_HARNESS = r"""
+const fs = require('fs');
+const vm = require('vm');
+
+const stores = new Map();
+const keyOf = (request) => new URL(request.url || request, 'http://localhost/').href;
+const openStore = (name) => {
+    if (!stores.has(name)) stores.set(name, new Map());
+    const store = stores.get(name);
+    return {
+        put: async (request, response) => { store.set(keyOf(request), response); },
+        match: async (request) => store.get(keyOf(request)),
+    };
+};
+const caches = {
+    open: async (name) => openStore(name),
+    has: async (name) => stores.has(name),
+    keys: async () => [...stores.keys()],
+    delete: async (name) => stores.delete(name),
+    match: async (request, options) => stores.has(options.cacheName)
+        ? openStore(options.cacheName).match(request) : undefined,
+};
+
+let requirements = 'pycardano==0.14.0\n';
+const fetch = async (url) => String(url).endsWith('pyodide-requirements.txt')
+    ? new Response(requirements) : new Response('', { status: 404 });
+
+const handlers = {};
+const self = {
+    location: new URL('http://localhost/sw.js'),
+    addEventListener: (type, handler) => { handlers[type] = handler; },
+    skipWaiting: async () => {},
+    clients: { claim: async () => {}, get: async () => undefined },
+};
+const silent = { log: () => {}, error: () => {} };
+const context = { self, caches, fetch, console: silent, crypto, TextEncoder, Response, Headers, URL };
+vm.runInNewContext(fs.readFileSync(process.argv[1], 'utf8'), context);
+
+async function dispatch(type, data) {
+    const pending = [];
+    let reply = () => {};
+    const replied = new Promise((resolve) => { reply = resolve; });
+    handlers[type]({ data, waitUntil: (promise) => pending.push(promise), ports: [{ postMessage: reply }] });
+    await Promise.all(pending);
+    if (type === 'message') await replied;
+}
+
+async function snapshot() {
+    const active = await caches.match('./runtime-cache/active', { cacheName: 'runtime-cache-metadata' });
+    return { active: active && await active.text(), caches: [...stores.keys()] };
+}
+
+(async () => {
+    await dispatch('install');
+    await dispatch('activate');
+    const installed = await snapshot();
+    requirements = 'pycardano==0.15.0\n';
+    await dispatch('message', { type: 'RUNTIME_CACHE_VERSION', requirements });
+    const switched = await snapshot();
+    process.stdout.write(JSON.stringify({ installed, switched }));
+})().catch((error) => { console.error(error); process.exit(1); });
+"""
+
 
 if __name__ == "__main__":
     # Run tests when executed directly